@@ -3,13 +3,13 @@
 Parse ONNX model measurement files and create a pandas DataFrame.
 
 This script reads performance CSV files and corresponding batterystats files,
-extracts relevant metrics, and creates a consolidated DataFrame saved as pickle.
+extracts relevant metrics, and creates a consolidated DataFrame saved as Parquet.
 
 Output columns:
 - filename: Model name (e.g., "conv_w128_h128_cin1_cout1_zi_t.onnx")
 - date_time: Timestamp of measurement (YYYYMMDD_HHMMSS)
-- current_list: List of current samples in mA
-- voltage_list: List of voltage samples in mV
+- current_list: Array of current samples in mA (int32)
+- voltage_list: Array of voltage samples in mV (uint16)
 - avg_power: Average power consumption in Watts
 - energy: Energy per single inference in Watt-hours
 - iterations: Number of inference iterations
@@ -17,16 +17,26 @@ Output columns:
 - totaltimesec: Total measurement time in seconds
 """
 
+import mmap
 import os
 import re
 import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
+import numpy as np
 import pandas as pd
 
 # Configuration
 MEASUREMENTS_DIR = "./measurements"
 REPORTS_DIR = "./reports"
+PERF_SUFFIX = "_performance.csv"
+STATS_SUFFIX = "_batterystats.txt"
+
+# Batterystats pattern (compiled once, matched against raw bytes).
+# Group 1 captures a voltage reading, group 2 a current reading.
+PAIR_RE = re.compile(rb'volt=(\d+)|current=(-?\d+)')
 
 
 def parse_performance_csv(csv_path: Path) -> Optional[Dict]:
@@ -36,11 +46,15 @@ def parse_performance_csv(csv_path: Path) -> Optional[Dict]:
     Returns dict with: model, timestamp, iterations, us_per_inference, total_time_sec
     """
     try:
-        df = pd.read_csv(csv_path)
-        if df.empty:
+        # The runner writes a fixed header line plus one unquoted data line
+        with open(csv_path) as f:
+            header = f.readline()
+            data = f.readline()
+        if not data.strip():
             return None
 
-        row = df.iloc[0]
+        row = dict(zip(header.rstrip().split(','), data.rstrip().split(',')))
+
         return {
             'model': row['model'],
             'timestamp': row['timestamp'],
@@ -60,47 +74,40 @@ def parse_batterystats_samples(stats_path: Path, total_time_sec: float) -> Optio
     Returns dict with: voltage_list, current_list, avg_power, energy
     """
     try:
-        with open(stats_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-
-        # Find lines with current measurements
-        current_lines = []
-        for line in content.split('\n'):
-            if 'current=' in line:
-                current_lines.append(line)
-
-        if not current_lines:
-            return None
-
-        voltage_list = []
-        current_list = []
+        # Compact sample buffers, grown during the scan without knowing the
+        # sample count up front
+        voltage_buf = array('H')
+        current_buf = array('i')
         last_volt = None
 
-        # Extract voltage and current pairs
-        for line in current_lines:
-            # Extract voltage
-            volt_match = re.search(r'volt=(\d+)', line)
-            if volt_match:
-                last_volt = int(volt_match.group(1))
-
-            # Extract current
-            curr_match = re.search(r'current=(-?\d+)', line)
-            if curr_match and last_volt is not None:
-                current = int(curr_match.group(1))
-                voltage_list.append(last_volt)
-                current_list.append(current)
-
-        if not voltage_list or not current_list:
+        with open(stats_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+
+            # Map the file instead of reading it, so the regex scans the
+            # page cache directly without a full in-memory copy
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                # Extract voltage and current pairs in a single scan; each
+                # current sample is paired with the most recent voltage reading
+                for m in PAIR_RE.finditer(content):
+                    volt, curr = m.group(1), m.group(2)
+                    if volt:
+                        last_volt = int(volt)
+                    elif curr and last_volt is not None:
+                        voltage_buf.append(last_volt)
+                        current_buf.append(int(curr))
+
+        if not current_buf:
             return None
 
+        voltage_list = np.array(voltage_buf, dtype=np.uint16)
+        current_list = np.array(current_buf, dtype=np.int32)
+
         # Calculate average power
         # Power (W) = Voltage (mV) * |Current| (mA) / 1,000,000
         # Current is negative for discharge, so we take absolute value
-        power_samples = [
-            (v * abs(c)) / 1_000_000.0
-            for v, c in zip(voltage_list, current_list)
-        ]
-        avg_power = sum(power_samples) / len(power_samples) if power_samples else 0.0
+        power_samples = voltage_list.astype(np.int64) * np.abs(current_list.astype(np.int64))
+        avg_power = float(power_samples.mean()) / 1_000_000.0
 
         # Calculate energy (Wh) = Power (W) * Time (s) / 3600
         energy = (avg_power * total_time_sec) / 3600.0 if total_time_sec > 0 else 0.0
@@ -116,23 +123,28 @@ def parse_batterystats_samples(stats_path: Path, total_time_sec: float) -> Optio
         return None
 
 
-def find_matching_batterystats(perf_path: Path, measurements_dir: Path) -> Optional[Path]:
+def scan_measurement_files(measurements_dir: Path) -> Tuple[Dict[str, Path], Dict[str, Path]]:
     """
-    Find the batterystats file that matches the performance file.
+    Collect performance and batterystats files in a single directory scan.
 
     Performance file format: model_TIMESTAMP_performance.csv
     Batterystats file format: model_TIMESTAMP_batterystats.txt
-    """
-    # Remove _performance.csv suffix
-    base_name = perf_path.stem.replace('_performance', '')
 
-    # Look for matching batterystats file with same timestamp
-    stats_path = measurements_dir / f"{base_name}_batterystats.txt"
+    Returns (perf_files, stats_files), both keyed by the shared model_TIMESTAMP
+    base name so matching files can be paired without extra stat() calls.
+    """
+    perf_files = {}
+    stats_files = {}
 
-    if stats_path.exists():
-        return stats_path
+    with os.scandir(measurements_dir) as entries:
+        for entry in entries:
+            name = entry.name
+            if name.endswith(PERF_SUFFIX):
+                perf_files[name[:-len(PERF_SUFFIX)]] = Path(entry.path)
+            elif name.endswith(STATS_SUFFIX):
+                stats_files[name[:-len(STATS_SUFFIX)]] = Path(entry.path)
 
-    return None
+    return perf_files, stats_files
 
 
 def extract_model_name_from_path(model_path: str) -> str:
@@ -143,6 +155,48 @@ def extract_model_name_from_path(model_path: str) -> str:
     return model_path
 
 
+def process_measurement_pair(perf_path: Path, stats_path: Optional[Path]) -> Tuple[Optional[Dict], str]:
+    """
+    Parse one performance CSV and its matching batterystats file.
+
+    Runs in a worker process. Returns (record, "") on success, or
+    (None, reason) if the pair has to be skipped.
+    """
+    # Parse performance data
+    perf_data = parse_performance_csv(perf_path)
+    if not perf_data:
+        return None, "no perf data"
+
+    # Check for matching batterystats file
+    if not stats_path:
+        return None, "no batterystats"
+
+    # Parse battery data
+    battery_data = parse_batterystats_samples(stats_path, perf_data['total_time_sec'])
+    if not battery_data:
+        return None, "no battery data"
+
+    # Calculate energy per inference
+    # Energy per inference (Wh) = Power (W) * Time per inference (s) / 3600
+    time_per_inf_sec = perf_data['us_per_inference'] / 1_000_000.0  # Convert µs to seconds
+    energy_per_inf = (battery_data['avg_power'] * time_per_inf_sec) / 3600.0
+
+    # Create record
+    record = {
+        'filename': perf_data['model'],
+        'date_time': perf_data['timestamp'],
+        'current_list': battery_data['current_list'],
+        'voltage_list': battery_data['voltage_list'],
+        'avg_power': battery_data['avg_power'],
+        'iterations': perf_data['iterations'],
+        'usperinf': perf_data['us_per_inference'],
+        'totaltimesec': perf_data['total_time_sec'],
+        'energy': energy_per_inf,
+    }
+
+    return record, ""
+
+
 def process_measurements(measurements_dir: Path) -> pd.DataFrame:
     """
     Process all measurement files and create a DataFrame.
@@ -150,18 +204,32 @@ def process_measurements(measurements_dir: Path) -> pd.DataFrame:
     Returns DataFrame with columns:
     - filename: Model name
     - date_time: Timestamp
-    - current_list: List of current samples
-    - voltage_list: List of voltage samples
+    - current_list: Array of current samples (int32)
+    - voltage_list: Array of voltage samples (uint16)
     - avg_power: Average power (W)
     - energy: Energy per single inference (Wh)
     - iterations: Number of inferences
     - usperinf: Microseconds per inference
     - totaltimesec: Total time (seconds)
     """
-    records = []
+    # Column order to match specification
+    column_order = [
+        'current_list',
+        'voltage_list',
+        'filename',
+        'date_time',
+        'avg_power',
+        'iterations',
+        'usperinf',
+        'totaltimesec',
+        'energy'
+    ]
+
+    # Collect values column by column so pandas can build each column directly
+    columns = {name: [] for name in column_order}
 
-    # Find all performance CSV files
-    perf_files = list(measurements_dir.glob("*_performance.csv"))
+    # Find all performance CSV and batterystats files
+    perf_files, stats_files = scan_measurement_files(measurements_dir)
 
     if not perf_files:
         print("No performance files found!", file=sys.stderr)
@@ -172,69 +240,30 @@ def process_measurements(measurements_dir: Path) -> pd.DataFrame:
     processed = 0
     skipped = 0
 
-    for perf_path in sorted(perf_files):
-        # Parse performance data
-        perf_data = parse_performance_csv(perf_path)
-        if not perf_data:
-            print(f"  ⚠ Skipped (no perf data): {perf_path.name}", file=sys.stderr)
-            skipped += 1
-            continue
-
-        # Find matching batterystats file
-        stats_path = find_matching_batterystats(perf_path, measurements_dir)
-        if not stats_path:
-            print(f"  ⚠ Skipped (no batterystats): {perf_path.name}", file=sys.stderr)
-            skipped += 1
-            continue
-
-        # Parse battery data
-        battery_data = parse_batterystats_samples(stats_path, perf_data['total_time_sec'])
-        if not battery_data:
-            print(f"  ⚠ Skipped (no battery data): {perf_path.name}", file=sys.stderr)
-            skipped += 1
-            continue
-
-        # Calculate energy per inference
-        # Energy per inference (Wh) = Power (W) * Time per inference (s) / 3600
-        time_per_inf_sec = perf_data['us_per_inference'] / 1_000_000.0  # Convert µs to seconds
-        energy_per_inf = (battery_data['avg_power'] * time_per_inf_sec) / 3600.0
-
-        # Create record
-        record = {
-            'filename': perf_data['model'],
-            'date_time': perf_data['timestamp'],
-            'current_list': battery_data['current_list'],
-            'voltage_list': battery_data['voltage_list'],
-            'avg_power': battery_data['avg_power'],
-            'iterations': perf_data['iterations'],
-            'usperinf': perf_data['us_per_inference'],
-            'totaltimesec': perf_data['total_time_sec'],
-            'energy': energy_per_inf,
-        }
+    # Each (performance, batterystats) pair is independent, so parse them in
+    # worker processes; map() keeps results in sorted file order
+    base_names = sorted(perf_files)
+    perf_paths = [perf_files[base_name] for base_name in base_names]
+    stats_paths = [stats_files.get(base_name) for base_name in base_names]
 
-        records.append(record)
-        processed += 1
-        print(f"  ✓ Processed: {perf_data['model']} ({perf_data['timestamp']})")
+    with ProcessPoolExecutor() as executor:
+        results = executor.map(process_measurement_pair, perf_paths, stats_paths, chunksize=4)
 
-    print(f"\nProcessed: {processed}, Skipped: {skipped}")
+        for perf_path, (record, skip_reason) in zip(perf_paths, results):
+            if record is None:
+                print(f"  ⚠ Skipped ({skip_reason}): {perf_path.name}", file=sys.stderr)
+                skipped += 1
+                continue
 
-    # Create DataFrame
-    df = pd.DataFrame(records)
+            for name in column_order:
+                columns[name].append(record[name])
+            processed += 1
+            print(f"  ✓ Processed: {record['filename']} ({record['date_time']})")
 
-    # Reorder columns to match specification
-    column_order = [
-        'current_list',
-        'voltage_list',
-        'filename',
-        'date_time',
-        'avg_power',
-        'iterations',
-        'usperinf',
-        'totaltimesec',
-        'energy'
-    ]
+    print(f"\nProcessed: {processed}, Skipped: {skipped}")
 
-    df = df[column_order]
+    # Create DataFrame
+    df = pd.DataFrame(columns, columns=column_order)
 
     return df
 
@@ -262,21 +291,22 @@ def main():
     from datetime import datetime
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
-    # Save to pickle in reports directory
+    # Save to Parquet in reports directory. The sample arrays are stored as
+    # Arrow list<uint16> / list<int32> columns, inferred from their dtypes
     reports_dir = Path(REPORTS_DIR)
     reports_dir.mkdir(parents=True, exist_ok=True)
 
-    output_filename = f"measurements_data_{timestamp}.pkl"
+    output_filename = f"measurements_data_{timestamp}.parquet"
     output_path = reports_dir / output_filename
 
     try:
-        df.to_pickle(str(output_path))
+        df.to_parquet(str(output_path), engine='pyarrow', compression='zstd')
         print(f"\n✓ DataFrame saved to: {output_path.absolute()}")
         print(f"  Shape: {df.shape[0]} rows × {df.shape[1]} columns")
         print(f"  Unique models: {df['filename'].nunique()}")
         print(f"  Date range: {df['date_time'].min()} to {df['date_time'].max()}")
     except Exception as e:
-        print(f"\n✗ Error saving pickle file: {e}", file=sys.stderr)
+        print(f"\n✗ Error saving Parquet file: {e}", file=sys.stderr)
         sys.exit(1)
 
     # Display sample
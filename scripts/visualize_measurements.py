@@ -7,14 +7,24 @@ showing energy consumption sorted by highest to lowest, with run counts for
 models that have been measured multiple times.
 
 Usage:
-    python3 visualize_measurements.py [pkl_file]
+    python3 visualize_measurements.py [data_file] [--format {svg,pdf,png}]
 
-If no file is specified, it will use the most recent pkl file from reports/
+The data file may be a .parquet (current) or .pkl (legacy) DataFrame. If no
+file is specified, it will use the most recent one from reports/
+
+The table is saved as SVG by default. Vector output skips rasterizing the
+(potentially very tall) table; use --format=png for a bitmap. PNG encoding
+is zlib-bound, so a Pillow build linked against libdeflate speeds it up
+with no code change. JPEG is not offered: it blurs table text and lines.
 """
 
+import argparse
 import sys
 from pathlib import Path
+import numpy as np
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # Files only; never touch a GUI toolkit
 import matplotlib.pyplot as plt
 from datetime import datetime
 
@@ -23,26 +33,51 @@ from datetime import datetime
 SCRIPT_DIR = Path(__file__).parent
 PROJECT_ROOT = SCRIPT_DIR.parent
 OUTPUT_DIR = PROJECT_ROOT / "reports" / "plots"
-
-
-def find_latest_pkl():
-    """Find the most recent pkl file in reports directory."""
+OUTPUT_FORMATS = ("svg", "pdf", "png")
+DEFAULT_FORMAT = "svg"
+RASTER_DPI = 100
+# Extra savefig options for PNG output: modest dpi and fast zlib level
+PNG_SAVE_KW = dict(dpi=RASTER_DPI, pil_kwargs={'compress_level': 1})
+# Scalar columns used by the table; the per-sample voltage/current
+# columns are never needed here
+SUMMARY_COLUMNS = ['filename', 'date_time', 'avg_power', 'iterations',
+                   'usperinf', 'totaltimesec', 'energy']
+SAMPLE_COLUMNS = ['current_list', 'voltage_list']
+
+
+def find_latest_data_file():
+    """Find the most recent parquet or pkl data file in reports directory."""
     reports_dir = PROJECT_ROOT / "reports"
 
     if not reports_dir.exists():
         print("Error: reports/ directory not found")
         return None
 
-    pkl_files = list(reports_dir.glob("measurements_data_*.pkl"))
+    data_files = (list(reports_dir.glob("measurements_data_*.parquet")) +
+                  list(reports_dir.glob("measurements_data_*.pkl")))
 
-    if not pkl_files:
-        print("Error: No pickle files found in reports/")
+    if not data_files:
+        print("Error: No parquet or pickle files found in reports/")
         return None
 
-    latest = sorted(pkl_files)[-1]
+    # File names only differ by timestamp, so compare stems across suffixes
+    latest = max(data_files, key=lambda path: path.stem)
     return latest
 
 
+def load_measurements(data_path):
+    """
+    Load the scalar measurement columns from a parquet or legacy pickle file.
+
+    Parquet files are read column-selectively, so the sample arrays are
+    never decoded. Pickles have to be loaded whole, then the sample columns
+    are dropped.
+    """
+    if data_path.suffix == '.parquet':
+        return pd.read_parquet(data_path, columns=SUMMARY_COLUMNS)
+    return pd.read_pickle(data_path).drop(columns=SAMPLE_COLUMNS, errors='ignore')
+
+
 def aggregate_measurements(df):
     """
     Aggregate measurements by model name.
@@ -52,60 +87,79 @@ def aggregate_measurements(df):
     Models with the same filename but different timestamps represent
     multiple measurement runs of the same model.
     """
-    # Group by filename and aggregate
-    df_agg = df.groupby('filename').agg({
-        'avg_power': 'mean',
-        'energy': 'mean',
-        'iterations': 'mean',
-        'usperinf': 'mean',
-        'totaltimesec': 'mean',
-    }).reset_index()
-
-    # Count unique timestamps (runs) for each model
+    # Group by filename and aggregate in a single pass.
     # Each unique date_time for a model represents one measurement run
-    run_counts = df.groupby('filename')['date_time'].nunique().reset_index(name='runs')
-    df_agg = df_agg.merge(run_counts, on='filename')
+    df_agg = df.groupby('filename', observed=True, sort=False).agg(
+        avg_power=('avg_power', 'mean'),
+        energy=('energy', 'mean'),
+        iterations=('iterations', 'mean'),
+        usperinf=('usperinf', 'mean'),
+        totaltimesec=('totaltimesec', 'mean'),
+        runs=('date_time', 'nunique'),
+    ).reset_index()
 
     # Rename filename to model_name for clarity
     df_agg.rename(columns={'filename': 'model_name'}, inplace=True)
 
+    # Short display name (no directory, no .onnx suffix), derived once here
+    # so the table and console summary don't recompute it
+    df_agg['model_short'] = (df_agg['model_name'].astype(str)
+                             .str.rsplit('/', n=1).str[-1].str.removesuffix('.onnx'))
+
     # Sort by number of runs (descending), then by energy (descending)
     df_agg = df_agg.sort_values(['runs', 'energy'], ascending=[False, False]).reset_index(drop=True)
 
     return df_agg
 
 
-def create_measurement_table(df_agg, output_dir):
+def _save(fig, output_file, fmt):
     """
-    Create a table visualization of measurements sorted by energy consumption.
-    Shows: Model Name, Runs, Avg Power (W), Energy (Wh), Iterations,
-           Time/Inference (ms), Total Time (s)
+    Save a figure in the given format.
+
+    The saved area is computed with bbox_inches='tight', which crops the
+    margins and grows the canvas around any artist that overflows the
+    figure, so the whole table and title are always written.
     """
-    # Prepare display data
-    display_df = df_agg.copy()
-
-    # Shorten model names for better display
-    display_df['Model'] = display_df['model_name'].apply(
-        lambda x: x.split('/')[-1].replace('.onnx', '')
-    )
-
-    # Format numeric columns
-    display_df['Runs'] = display_df['runs'].astype(int)
-    display_df['Avg Power (W)'] = display_df['avg_power'].apply(lambda x: f'{x:.3f}')
-    display_df['Energy (Wh)'] = display_df['energy'].apply(lambda x: f'{x:.6f}')
-    display_df['Iterations'] = display_df['iterations'].astype(int)
-    display_df['Time/Inf (ms)'] = (display_df['usperinf'] / 1000).apply(lambda x: f'{x:.2f}')
-    display_df['Total Time (s)'] = display_df['totaltimesec'].apply(lambda x: f'{x:.2f}')
-
-    # Select columns for display
-    table_data = display_df[['Model', 'Runs', 'Avg Power (W)', 'Energy (Wh)',
-                              'Iterations', 'Time/Inf (ms)', 'Total Time (s)']]
-
-    # Calculate figure size based on number of rows
+    save_kwargs = PNG_SAVE_KW if fmt == 'png' else {}
+    fig.savefig(output_file, bbox_inches='tight', facecolor='white', **save_kwargs)
+
+
+def _render_table(df_agg, sort_by, ascending, output_dir, output_name, title_suffix,
+                  n_models=None, total_runs=None, fmt=DEFAULT_FORMAT):
+    """
+    Render aggregated measurements as a table image.
+
+    If sort_by is given, rows are sorted by those columns first; otherwise the
+    order of df_agg is kept. n_models and total_runs are computed from df_agg
+    unless passed in. The file is written as output_name.<fmt>. Returns the
+    formatted table data.
+    """
+    if n_models is None:
+        n_models = df_agg['model_name'].nunique()
+    if total_runs is None:
+        total_runs = int(df_agg['runs'].sum())
+
+    if sort_by is not None:
+        df_agg = df_agg.sort_values(sort_by, ascending=ascending).reset_index(drop=True)
+
+    # Build the display table directly from df_agg's columns (no full copy):
+    # shortened model names plus formatted numeric columns
+    table_data = pd.DataFrame({
+        'Model': df_agg['model_short'],
+        'Runs': df_agg['runs'].astype(int),
+        'Avg Power (W)': np.char.mod('%.3f', df_agg['avg_power'].to_numpy(dtype=np.float64)),
+        'Energy (Wh)': np.char.mod('%.6f', df_agg['energy'].to_numpy(dtype=np.float64)),
+        'Iterations': df_agg['iterations'].astype(int),
+        'Time/Inf (ms)': np.char.mod('%.2f', df_agg['usperinf'].to_numpy(dtype=np.float64) / 1000),
+        'Total Time (s)': np.char.mod('%.2f', df_agg['totaltimesec'].to_numpy(dtype=np.float64)),
+    })
+
+    # Calculate figure size based on number of rows. Not capped, so the
+    # title stays above the table however many models there are
     num_rows = len(table_data)
     row_height = 0.4
     header_height = 0.6
-    fig_height = min(header_height + (num_rows * row_height), 40)  # Cap at 40 inches
+    fig_height = header_height + (num_rows * row_height)
 
     # Create figure
     fig, ax = plt.subplots(figsize=(18, fig_height))
@@ -131,145 +185,69 @@ def create_measurement_table(df_agg, output_dir):
         cell.set_text_props(weight='bold', color='white')
 
     # Color rows with gradient based on number of runs
-    max_runs = df_agg['runs'].max()
-    min_runs = df_agg['runs'].min()
-
-    for i in range(len(table_data)):
-        row_num = i + 1
-        runs_val = df_agg.iloc[i]['runs']
+    runs = df_agg['runs'].to_numpy(dtype=np.float64)
+    max_runs = runs.max()
+    min_runs = runs.min()
 
-        # Normalize runs value to 0-1 range
-        if max_runs > min_runs:
-            norm_runs = (runs_val - min_runs) / (max_runs - min_runs)
-        else:
-            norm_runs = 0.5
-
-        # Blue gradient - darker blue for more runs
-        r = 0.3 + (1 - norm_runs) * 0.7  # 0.3 to 1.0
-        g = 0.5 + (1 - norm_runs) * 0.5  # 0.5 to 1.0
-        b = 1.0  # Always 1.0 for blue
-
-        row_color = (r, g, b, 0.3)  # Alpha = 0.3 for transparency
-
-        for j in range(len(table_data.columns)):
-            cell = table[(row_num, j)]
-            cell.set_facecolor(row_color)
+    # Normalize runs values to 0-1 range
+    if max_runs > min_runs:
+        norm_runs = (runs - min_runs) / (max_runs - min_runs)
+    else:
+        norm_runs = np.full_like(runs, 0.5)
+
+    # Blue gradient - darker blue for more runs, alpha = 0.3 for transparency
+    row_colors = np.stack([
+        0.3 + (1 - norm_runs) * 0.7,  # r: 0.3 to 1.0
+        0.5 + (1 - norm_runs) * 0.5,  # g: 0.5 to 1.0
+        np.ones_like(norm_runs),      # b: always 1.0 for blue
+        np.full_like(norm_runs, 0.3),
+    ], axis=1)
+
+    cells = table.get_celld()
+    num_cols = len(table_data.columns)
+    for i, row_color in enumerate(map(tuple, row_colors), start=1):
+        for j in range(num_cols):
+            cells[(i, j)].set_facecolor(row_color)
 
     # Add title
-    title = f'ONNX Model Power Measurements - Sorted by Number of Runs\n'
-    title += f'Total Models: {df_agg["model_name"].nunique()} | '
-    title += f'Total Measurements: {df_agg["runs"].sum()} | '
+    title = f'ONNX Model Power Measurements - {title_suffix}\n'
+    title += f'Total Models: {n_models} | '
+    title += f'Total Measurements: {total_runs} | '
     title += f'Generated: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}'
 
     plt.title(title, fontsize=14, fontweight='bold', pad=20)
 
     # Save
-    output_file = output_dir / "measurements_table.png"
-    plt.savefig(output_file, dpi=300, bbox_inches='tight', facecolor='white')
+    output_file = output_dir / f"{output_name}.{fmt}"
+    _save(fig, output_file, fmt)
     print(f"     ✓ Saved: {output_file.name}")
-    plt.close()
+    plt.close(fig)
 
     return table_data
 
 
-def create_measurement_table_by_runs(df_agg, output_dir):
+def create_measurement_table(df_agg, output_dir, n_models=None, total_runs=None,
+                             fmt=DEFAULT_FORMAT):
     """
-    Create a table visualization of measurements sorted by number of runs.
+    Create a table visualization of measurements sorted by energy consumption.
     Shows: Model Name, Runs, Avg Power (W), Energy (Wh), Iterations,
            Time/Inference (ms), Total Time (s)
     """
-    # Sort by runs (highest first), then by energy
-    df_sorted = df_agg.sort_values(['runs', 'energy'], ascending=[False, False]).reset_index(drop=True)
-
-    # Prepare display data
-    display_df = df_sorted.copy()
-
-    # Shorten model names for better display
-    display_df['Model'] = display_df['model_name'].apply(
-        lambda x: x.split('/')[-1].replace('.onnx', '')
-    )
-
-    # Format numeric columns
-    display_df['Runs'] = display_df['runs'].astype(int)
-    display_df['Avg Power (W)'] = display_df['avg_power'].apply(lambda x: f'{x:.3f}')
-    display_df['Energy (Wh)'] = display_df['energy'].apply(lambda x: f'{x:.6f}')
-    display_df['Iterations'] = display_df['iterations'].astype(int)
-    display_df['Time/Inf (ms)'] = (display_df['usperinf'] / 1000).apply(lambda x: f'{x:.2f}')
-    display_df['Total Time (s)'] = display_df['totaltimesec'].apply(lambda x: f'{x:.2f}')
-
-    # Select columns for display
-    table_data = display_df[['Model', 'Runs', 'Avg Power (W)', 'Energy (Wh)',
-                              'Iterations', 'Time/Inf (ms)', 'Total Time (s)']]
-
-    # Calculate figure size based on number of rows
-    num_rows = len(table_data)
-    row_height = 0.4
-    header_height = 0.6
-    fig_height = min(header_height + (num_rows * row_height), 40)  # Cap at 40 inches
+    return _render_table(df_agg, None, None, output_dir,
+                         "measurements_table", "Sorted by Number of Runs",
+                         n_models, total_runs, fmt)
 
-    # Create figure
-    fig, ax = plt.subplots(figsize=(18, fig_height))
-    ax.axis('tight')
-    ax.axis('off')
 
-    # Create table
-    table = ax.table(cellText=table_data.values,
-                    colLabels=table_data.columns,
-                    cellLoc='left',
-                    loc='center',
-                    colWidths=[0.35, 0.08, 0.12, 0.12, 0.11, 0.12, 0.10])
-
-    # Style the table
-    table.auto_set_font_size(False)
-    table.set_fontsize(9)
-    table.scale(1, 1.5)
-
-    # Color the header
-    for i in range(len(table_data.columns)):
-        cell = table[(0, i)]
-        cell.set_facecolor('#4472C4')
-        cell.set_text_props(weight='bold', color='white')
-
-    # Color rows with gradient based on number of runs
-    max_runs = df_sorted['runs'].max()
-    min_runs = df_sorted['runs'].min()
-
-    for i in range(len(table_data)):
-        row_num = i + 1
-        runs_val = df_sorted.iloc[i]['runs']
-
-        # Normalize runs value to 0-1 range
-        if max_runs > min_runs:
-            norm_runs = (runs_val - min_runs) / (max_runs - min_runs)
-        else:
-            norm_runs = 0.5
-
-        # Blue gradient - darker blue for more runs
-        r = 0.3 + (1 - norm_runs) * 0.7  # 0.3 to 1.0
-        g = 0.5 + (1 - norm_runs) * 0.5  # 0.5 to 1.0
-        b = 1.0  # Always 1.0 for blue
-
-        row_color = (r, g, b, 0.3)  # Alpha = 0.3 for transparency
-
-        for j in range(len(table_data.columns)):
-            cell = table[(row_num, j)]
-            cell.set_facecolor(row_color)
-
-    # Add title
-    title = f'ONNX Model Power Measurements - Sorted by Number of Runs\n'
-    title += f'Total Models: {df_sorted["model_name"].nunique()} | '
-    title += f'Total Measurements: {df_sorted["runs"].sum()} | '
-    title += f'Generated: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}'
-
-    plt.title(title, fontsize=14, fontweight='bold', pad=20)
-
-    # Save
-    output_file = output_dir / "measurements_table_by_runs.png"
-    plt.savefig(output_file, dpi=300, bbox_inches='tight', facecolor='white')
-    print(f"     ✓ Saved: {output_file.name}")
-    plt.close()
-
-    return table_data
+def create_measurement_table_by_runs(df_agg, output_dir, n_models=None, total_runs=None,
+                                     fmt=DEFAULT_FORMAT):
+    """
+    Create a table visualization of measurements sorted by number of runs.
+    Shows: Model Name, Runs, Avg Power (W), Energy (Wh), Iterations,
+           Time/Inference (ms), Total Time (s)
+    """
+    return _render_table(df_agg, ['runs', 'energy'], [False, False], output_dir,
+                         "measurements_table_by_runs", "Sorted by Number of Runs",
+                         n_models, total_runs, fmt)
 
 
 def print_summary_stats(df, df_agg):
@@ -277,28 +255,32 @@ def print_summary_stats(df, df_agg):
     print("\n" + "=" * 70)
     print("📊 SUMMARY STATISTICS")
     print("=" * 70)
+    # Compute all statistics in one aggregation call per column
+    p_stats = df_agg['avg_power'].agg(['mean', 'min', 'max'])
+    e_stats = df_agg['energy'].agg(['mean', 'min', 'max', 'sum'])
+    means = df_agg[['runs', 'iterations', 'usperinf', 'totaltimesec']].mean()
+
     print(f"\nTotal unique models: {df['filename'].nunique()}")
     print(f"Total measurements: {len(df)}")
-    print(f"Average runs per model: {df_agg['runs'].mean():.1f}")
+    print(f"Average runs per model: {means['runs']:.1f}")
     print(f"\nPower Consumption:")
-    print(f"  Average: {df_agg['avg_power'].mean():.3f} W")
-    print(f"  Min: {df_agg['avg_power'].min():.3f} W")
-    print(f"  Max: {df_agg['avg_power'].max():.3f} W")
+    print(f"  Average: {p_stats['mean']:.3f} W")
+    print(f"  Min: {p_stats['min']:.3f} W")
+    print(f"  Max: {p_stats['max']:.3f} W")
     print(f"\nEnergy Consumption:")
-    print(f"  Average: {df_agg['energy'].mean():.6f} Wh")
-    print(f"  Min: {df_agg['energy'].min():.6f} Wh")
-    print(f"  Max: {df_agg['energy'].max():.6f} Wh")
-    print(f"  Total: {df_agg['energy'].sum():.6f} Wh")
+    print(f"  Average: {e_stats['mean']:.6f} Wh")
+    print(f"  Min: {e_stats['min']:.6f} Wh")
+    print(f"  Max: {e_stats['max']:.6f} Wh")
+    print(f"  Total: {e_stats['sum']:.6f} Wh")
     print(f"\nPerformance:")
-    print(f"  Avg iterations: {df_agg['iterations'].mean():.0f}")
-    print(f"  Avg time per inference: {df_agg['usperinf'].mean()/1000:.2f} ms")
-    print(f"  Avg total time: {df_agg['totaltimesec'].mean():.2f} s")
+    print(f"  Avg iterations: {means['iterations']:.0f}")
+    print(f"  Avg time per inference: {means['usperinf']/1000:.2f} ms")
+    print(f"  Avg total time: {means['totaltimesec']:.2f} s")
 
     # Top 5 energy consumers
     print(f"\n🔥 TOP 5 ENERGY CONSUMERS:")
     for idx, row in df_agg.head(5).iterrows():
-        model_name = row['model_name'].split('/')[-1].replace('.onnx', '')
-        print(f"  {idx+1}. {model_name[:60]}")
+        print(f"  {idx+1}. {row['model_short'][:60]}")
         print(f"     Energy: {row['energy']:.6f} Wh | Runs: {row['runs']} | Avg Power: {row['avg_power']:.3f} W")
 
     print("=" * 70)
@@ -306,25 +288,33 @@ def print_summary_stats(df, df_agg):
 
 def main():
     """Main execution function."""
+    parser = argparse.ArgumentParser(description="Visualize ONNX measurement results as a table.")
+    parser.add_argument("data_file", nargs="?", type=Path,
+                        help="parquet or pkl file (default: most recent in reports/)")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default=DEFAULT_FORMAT,
+                        help=f"output format for the table (default: {DEFAULT_FORMAT})")
+    args = parser.parse_args()
+
     print("=" * 70)
     print("ONNX Measurement Table Visualization")
     print("=" * 70)
 
     # Determine which file to load
-    if len(sys.argv) > 1:
-        pkl_path = Path(sys.argv[1])
+    if args.data_file is not None:
+        data_path = args.data_file
     else:
-        pkl_path = find_latest_pkl()
-        if pkl_path is None:
+        data_path = find_latest_data_file()
+        if data_path is None:
             sys.exit(1)
 
-    if not pkl_path.exists():
-        print(f"Error: File not found: {pkl_path}")
+    if not data_path.exists():
+        print(f"Error: File not found: {data_path}")
         sys.exit(1)
 
     # Load DataFrame
-    print(f"\n📂 Loading: {pkl_path}")
-    df = pd.read_pickle(pkl_path)
+    print(f"\n📂 Loading: {data_path}")
+    df = load_measurements(data_path)
+    df['filename'] = df['filename'].astype('category')
     print(f"   Loaded {len(df)} measurements")
 
     # Aggregate measurements by model
@@ -339,7 +329,9 @@ def main():
 
     # Generate table visualization
     print("\n📈 Creating table visualization:")
-    table_data = create_measurement_table(df_agg, output_dir)
+    n_models = df_agg['model_name'].nunique()
+    total_runs = int(df_agg['runs'].sum())
+    table_data = create_measurement_table(df_agg, output_dir, n_models, total_runs, args.format)
 
     # Print summary statistics
     print_summary_stats(df, df_agg)